@@ -5,18 +5,46 @@ Collects text from Reddit, Yahoo Finance, StockTwits and analyzes sentiment
 """
 
 import sqlite3
+import hashlib
+import asyncio
+import aiohttp
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 import praw
-import yfinance as yf
-from datetime import datetime, timedelta, date
+from datetime import timedelta, date
 from typing import List, Dict, Optional
 import time
 import re
+import math
+import string
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import os
 from dotenv import load_dotenv
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer, NEGATE, N_SCALAR, BOOSTER_DICT, SPECIAL_CASES
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import pandas as pd
+import torch
+
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+except ImportError:
+    ORTModelForSequenceClassification = None
+
+try:
+    from optimum.bettertransformer import BetterTransformer
+except ImportError:
+    BetterTransformer = None
+
+try:
+    import numpy as np
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
 # Load environment variables
 load_dotenv()
@@ -25,33 +53,262 @@ load_dotenv()
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
 REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
 REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "catalyst-dashboard-app")
+REDDIT_SUBREDDITS = ['stocks', 'investing', 'SecurityAnalysis', 'ValueInvesting', 'wallstreetbets']
+REDDIT_REQUESTS_PER_SECOND = 1  # Reddit allows 60 requests/minute
+REDDIT_BURST = 5
+REDDIT_INFO_BATCH = 100  # reddit.info() returns at most 100 items per call
+PULLPUSH_URL = "https://api.pullpush.io/reddit/search/submission/"
+PULLPUSH_PAGE_SIZE = 100
+FINBERT_MODEL_NAME = "ProsusAI/finbert"
+FINBERT_ONNX_DIR = os.getenv("FINBERT_ONNX_DIR", "finbert_onnx_quant")
+FINBERT_BATCH_SIZE = 32
+SENTIMENT_WORKERS = max(1, (os.cpu_count() or 1) // 2)
+SENTIMENT_PARALLEL_MIN_TEXTS = 256  # below this, model load time in workers outweighs the gain
+HTTP_CONCURRENCY = 10
+HTTP_POOL_SIZE = 50
+HTTP_POOL_PER_HOST = 20
+REQUEST_TIMEOUT = 30
+YAHOO_NEWS_COUNT = 20
+CACHE_LOOKUP_CHUNK = 500
+SENTIMENT_SCORER_VERSION = 2  # bump whenever VADER/FinBERT scoring logic changes to invalidate the cache
+VADER_MAX_EMOJI = 5
+VADER_FAST_MAX_TOKENS = 32
+
+# VADER slows down badly on emoji-heavy text, so only the first few are kept
+EMOJI_RE = re.compile(r'[\U0001F300-\U0001FAFF\U00002600-\U000027BF]')
+
+def chunked(items: List, size: int) -> List[List]:
+    """Split a list into consecutive chunks of at most size items"""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def content_hash(text: str) -> bytes:
+    """Fixed-width 8-byte digest used to deduplicate stored texts"""
+    return hashlib.blake2b(text.encode(), digest_size=8).digest()
+
+def iso_date(timestamp: str) -> date:
+    """Date part of a fixed-format ISO-8601 timestamp, without strptime"""
+    return date(int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10]))
+
+def cap_emoji(text: str, limit: int = VADER_MAX_EMOJI) -> str:
+    """Drop every emoji after the first `limit` occurrences"""
+    seen = 0
+    
+    def keep_first(match):
+        nonlocal seen
+        seen += 1
+        return match.group(0) if seen <= limit else ''
+    
+    return EMOJI_RE.sub(keep_first, text)
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def vader_compound_kernel(token_ids, valence, negator, n_scalar, alpha):
+        """Sum lexicon valences per row with VADER's negation window and normalize"""
+        n_rows, n_cols = token_ids.shape
+        compound = np.zeros(n_rows, dtype=np.float64)
+        
+        for row in prange(n_rows):
+            total = 0.0
+            for col in range(n_cols):
+                score = valence[token_ids[row, col]]
+                if score == 0.0:
+                    continue
+                
+                # A negator up to three words back flips and dampens the valence
+                for back in range(1, 4):
+                    if col >= back and negator[token_ids[row, col - back]]:
+                        score *= n_scalar
+                total += score
+            
+            compound[row] = min(1.0, max(-1.0, total / np.sqrt(total * total + alpha)))
+        
+        return compound
+
+class FastVaderScorer:
+    """Vectorized VADER compound scores for short, plain texts such as headlines
+    
+    Only the lexicon sum, negation window and normalization are implemented, so
+    texts that would hit any other VADER rule (boosters, "but", caps emphasis,
+    punctuation emphasis, emoji...) are rejected and left to the full analyzer.
+    """
+    
+    # Single words that trigger VADER rules this scorer does not implement
+    COMPLEX_WORDS = (
+        {phrase for phrase in list(BOOSTER_DICT) + list(SPECIAL_CASES) if ' ' not in phrase}
+        | {'but', 'least', 'kind', 'no', 'never', 'without', 'so', 'this'}
+    )
+    
+    # Multi-word boosters and idioms, only rejected when the whole phrase occurs
+    COMPLEX_PHRASES = {phrase for phrase in list(BOOSTER_DICT) + list(SPECIAL_CASES) if ' ' in phrase}
+    
+    def __init__(self, vader: SentimentIntensityAnalyzer):
+        self.emojis = vader.emojis
+        self.lexicon = vader.lexicon
+        
+        # Token id 0 is padding/unknown, the last id stands in for any "n't" contraction
+        words = sorted(set(vader.lexicon) | set(NEGATE))
+        self.word_ids = {word: i + 1 for i, word in enumerate(words)}
+        self.contraction_id = len(words) + 1
+        
+        self.valence = np.zeros(len(words) + 2, dtype=np.float64)
+        self.negator = np.zeros(len(words) + 2, dtype=np.bool_)
+        for word, token_id in self.word_ids.items():
+            self.valence[token_id] = vader.lexicon.get(word, 0.0)
+            self.negator[token_id] = word in NEGATE and word not in vader.lexicon
+        self.negator[self.contraction_id] = True
+    
+    def tokenize(self, text: str) -> Optional[List[int]]:
+        """Map text to lexicon token ids, or None if it needs the full analyzer"""
+        if '!' in text or '?' in text or any(char in self.emojis for char in text):
+            return None
+        
+        words = text.split()
+        if len(words) > VADER_FAST_MAX_TOKENS:
+            return None
+        
+        token_ids = []
+        tokens_lower = []
+        for word in words:
+            # Same punctuation handling as VADER's SentiText
+            stripped = word.strip(string.punctuation)
+            token = stripped if len(stripped) > 2 else word
+            token_lower = token.lower()
+            
+            if token_lower in self.COMPLEX_WORDS or (token.isupper() and token_lower in self.lexicon):
+                return None
+            
+            token_id = self.word_ids.get(token_lower, 0)
+            if token_id == 0 and "n't" in token_lower:
+                token_id = self.contraction_id
+            token_ids.append(token_id)
+            tokens_lower.append(token_lower)
+        
+        # VADER's idiom check looks at adjacent bigrams and trigrams
+        for size in (2, 3):
+            for start in range(len(tokens_lower) - size + 1):
+                if " ".join(tokens_lower[start:start + size]) in self.COMPLEX_PHRASES:
+                    return None
+        
+        return token_ids
+    
+    def score(self, texts: List[str]) -> List[Optional[float]]:
+        """Compound scores for each text, None where the full analyzer is needed"""
+        tokenized = [self.tokenize(text) for text in texts]
+        rows = [i for i, token_ids in enumerate(tokenized) if token_ids]
+        scores = [None if token_ids is None else 0.0 for token_ids in tokenized]
+        
+        if rows:
+            matrix = np.zeros((len(rows), max(len(tokenized[i]) for i in rows)), dtype=np.int16)
+            for row, i in enumerate(rows):
+                matrix[row, :len(tokenized[i])] = tokenized[i]
+            
+            compound = vader_compound_kernel(matrix, self.valence, self.negator, N_SCALAR, 15.0)
+            for row, i in enumerate(rows):
+                scores[i] = round(float(compound[row]), 4)
+        
+        return scores
+
+class TokenBucket:
+    """Thread-safe token bucket for pacing API requests"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait)
 
 class SentimentAnalyzer:
-    def __init__(self, db_path='events.db'):
+    def __init__(self, db_path='events.db', cache_path='sentiment_cache.db', models_only=False,
+                 finbert_threads: Optional[int] = None, finbert_backend: Optional[str] = None):
         self.db_path = db_path
+        self.cache_path = cache_path
+        self.finbert_threads = finbert_threads
+        self.finbert_backend = finbert_backend
+        
+        # Scoring workers only need the models, not the databases or API clients
+        if models_only:
+            self.init_analyzers()
+            return
+        
+        self.init_connection()
         self.init_db()
+        self.init_cache()
         self.init_analyzers()
         self.init_reddit()
     
+    def init_connection(self):
+        """Open the long-lived database connection used for all reads and writes"""
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+    
+    def close(self):
+        """Close database connections, the Reddit search pool and the HTTP session"""
+        self.reddit_executor.shutdown()
+        self.http.close()
+        self.conn.close()
+        self.sent_cache.close()
+    
     def init_db(self):
         """Initialize sentiment database tables"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute('''
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(sentiment_data)")]
+        legacy_schema = bool(columns) and 'content_hash' not in columns
+        
+        self.conn.execute("BEGIN")
+        
+        if legacy_schema:
+            # Older databases deduplicated on the full text; rebuild keyed on its hash
+            print("Migrating sentiment_data to content_hash deduplication...")
+            self.conn.execute("ALTER TABLE sentiment_data RENAME TO sentiment_data_legacy")
+        
+        self.conn.execute('''
             CREATE TABLE IF NOT EXISTS sentiment_data (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT NOT NULL,
                 ticker TEXT NOT NULL,
                 source TEXT NOT NULL,
                 text_content TEXT NOT NULL,
+                content_hash BLOB NOT NULL,
                 vader_score REAL,
                 finbert_score REAL,
                 finbert_label TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(timestamp, ticker, source, text_content)
+                UNIQUE(ticker, source, timestamp, content_hash)
             )
         ''')
         
-        conn.execute('''
+        if legacy_schema:
+            self.conn.create_function("content_hash", 1, content_hash, deterministic=True)
+            self.conn.execute('''
+                INSERT OR IGNORE INTO sentiment_data 
+                (id, timestamp, ticker, source, text_content, content_hash,
+                 vader_score, finbert_score, finbert_label, created_at)
+                SELECT id, timestamp, ticker, source, text_content, content_hash(text_content),
+                       vader_score, finbert_score, finbert_label, created_at
+                FROM sentiment_data_legacy
+            ''')
+            self.conn.execute("DROP TABLE sentiment_data_legacy")
+        
+        self.conn.execute('''
             CREATE TABLE IF NOT EXISTS daily_sentiment (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 date TEXT NOT NULL,
@@ -64,8 +321,40 @@ class SentimentAnalyzer:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Covering index so daily aggregation is an index-only range scan
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_sent_ticker_ts
+            ON sentiment_data(ticker, timestamp, vader_score, finbert_score)
+        ''')
+        
+        # Dashboard reads daily sentiment by ticker and date
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_daily_ticker
+            ON daily_sentiment(ticker, date)
+        ''')
+        
+        self.conn.commit()
+    
+    def init_cache(self):
+        """Open the persistent sentiment cache keyed by text hash and scorer"""
+        self.sent_cache = sqlite3.connect(self.cache_path)
+        
+        # Caches written before scorer tracking cannot be trusted, so start over
+        columns = [row[1] for row in self.sent_cache.execute("PRAGMA table_info(sentiment_cache)")]
+        if columns and 'scorer' not in columns:
+            self.sent_cache.execute("DROP TABLE sentiment_cache")
+        
+        self.sent_cache.execute('''
+            CREATE TABLE IF NOT EXISTS sentiment_cache (
+                hash BLOB NOT NULL,
+                scorer TEXT NOT NULL,
+                vader REAL,
+                finbert REAL,
+                label TEXT,
+                PRIMARY KEY (hash, scorer)
+            )
+        ''')
+        self.sent_cache.commit()
     
     def init_analyzers(self):
         """Initialize sentiment analysis models"""
@@ -73,31 +362,114 @@ class SentimentAnalyzer:
         
         # VADER for social media sentiment
         self.vader = SentimentIntensityAnalyzer()
+        self.fast_vader = FastVaderScorer(self.vader) if njit is not None else None
         
         # FinBERT for financial sentiment
+        self.finbert_device = 0 if torch.cuda.is_available() else -1
         try:
-            model_name = "ProsusAI/finbert"
-            self.finbert_tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.finbert_model = AutoModelForSequenceClassification.from_pretrained(model_name)
-            self.finbert_pipeline = pipeline(
-                "sentiment-analysis",
-                model=self.finbert_model,
-                tokenizer=self.finbert_tokenizer,
-                return_all_scores=True
-            )
+            self.finbert_tokenizer = AutoTokenizer.from_pretrained(FINBERT_MODEL_NAME)
+            self.finbert_model = self.load_finbert_model(self.finbert_backend)
+            
+            # Resolve label positions once instead of per sample
+            config = self.finbert_model.config
+            self.finbert_pos_idx = config.label2id['positive']
+            self.finbert_neg_idx = config.label2id['negative']
+            self.finbert_id2label = config.id2label
             print("FinBERT loaded successfully")
         except Exception as e:
             print(f"Warning: Could not load FinBERT: {e}")
-            self.finbert_pipeline = None
+            self.finbert_model = None
+            self.finbert_backend = None
+    
+    def load_finbert_model(self, backend: Optional[str] = None):
+        """Load FinBERT: FP16 on GPU, otherwise preferring an int8-quantized ONNX Runtime export
+        
+        Pool workers pass the parent's resolved backend so they load exactly the same
+        model and never export or quantize it themselves.
+        """
+        if backend == "onnx-int8":
+            return self.load_onnx_finbert()
+        if backend == "torch-fp32":
+            return self.load_torch_finbert()
+        if backend == "torch-fp16":
+            return self.load_torch_finbert(torch.float16).to(self.finbert_device)
+        if backend is not None:
+            raise ValueError(f"Unknown FinBERT backend: {backend}")
+        
+        if self.finbert_device >= 0:
+            # TF32 matmuls for anything left in FP32 on Ampere and newer
+            torch.backends.cuda.matmul.allow_tf32 = True
+            print("Using FP16 FinBERT on GPU")
+            return self.load_torch_finbert(torch.float16).to(self.finbert_device)
+        
+        if ORTModelForSequenceClassification is None:
+            return self.load_torch_finbert()
+        
+        try:
+            if not os.path.exists(os.path.join(FINBERT_ONNX_DIR, "model_quantized.onnx")):
+                print(f"Exporting quantized FinBERT to {FINBERT_ONNX_DIR}...")
+                onnx_model = ORTModelForSequenceClassification.from_pretrained(FINBERT_MODEL_NAME, export=True)
+                onnx_model.save_pretrained(FINBERT_ONNX_DIR)
+                
+                # Dynamic int8 quantization, uses VNNI dot products where the CPU has them
+                quantizer = ORTQuantizer.from_pretrained(onnx_model)
+                quantizer.quantize(
+                    save_dir=FINBERT_ONNX_DIR,
+                    quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+                )
+            
+            return self.load_onnx_finbert()
+        except Exception as e:
+            print(f"Warning: Could not load quantized FinBERT, falling back to FP32: {e}")
+            return self.load_torch_finbert()
+    
+    def load_onnx_finbert(self):
+        """Load the already exported int8 ONNX Runtime FinBERT"""
+        # Pool workers cap ONNX Runtime's intra-op threads so they do not oversubscribe the CPU
+        session_options = onnxruntime.SessionOptions()
+        if self.finbert_threads:
+            session_options.intra_op_num_threads = self.finbert_threads
+        
+        model = ORTModelForSequenceClassification.from_pretrained(
+            FINBERT_ONNX_DIR,
+            file_name="model_quantized.onnx",
+            session_options=session_options
+        )
+        print("Using int8 ONNX Runtime FinBERT")
+        self.finbert_backend = "onnx-int8"
+        return model
+    
+    def load_torch_finbert(self, dtype=torch.float32):
+        """Load the PyTorch FinBERT with fused attention kernels when available"""
+        model = AutoModelForSequenceClassification.from_pretrained(FINBERT_MODEL_NAME, torch_dtype=dtype).eval()
+        self.finbert_backend = "torch-fp16" if dtype == torch.float16 else "torch-fp32"
+        
+        if BetterTransformer is not None:
+            try:
+                # Fused multi-head attention instead of the stock per-op BERT layers
+                model = BetterTransformer.transform(model)
+            except Exception as e:
+                print(f"Warning: BetterTransformer unavailable for FinBERT: {e}")
+        
+        return model
     
     def init_reddit(self):
         """Initialize Reddit API client"""
+        # Shared by every ticker so the request budget is global
+        self.reddit_bucket = TokenBucket(REDDIT_REQUESTS_PER_SECOND, REDDIT_BURST)
+        
+        # Keep-alive session for the Pullpush searches made from the Reddit thread
+        self.http = requests.Session()
+        self.http.headers['Accept-Encoding'] = 'gzip'
+        self.http.mount('https://', HTTPAdapter(pool_connections=HTTP_POOL_PER_HOST, pool_maxsize=HTTP_POOL_SIZE))
+        
+        # PRAW is not thread-safe: each search thread gets its own client, and the
+        # pool is kept for the whole run so those clients are reused across tickers
+        self.reddit_local = threading.local()
+        self.reddit_executor = ThreadPoolExecutor(max_workers=len(REDDIT_SUBREDDITS))
+        
         try:
-            self.reddit = praw.Reddit(
-                client_id=REDDIT_CLIENT_ID,
-                client_secret=REDDIT_CLIENT_SECRET,
-                user_agent=REDDIT_USER_AGENT
-            )
+            self.reddit = self.create_reddit()
             print("Reddit API initialized")
         except Exception as e:
             print(f"Warning: Could not initialize Reddit API: {e}")
@@ -105,220 +477,464 @@ class SentimentAnalyzer:
     
     def analyze_sentiment(self, text: str) -> Dict:
         """Analyze sentiment using both VADER and FinBERT"""
-        results = {}
+        return self.analyze_sentiment_batch([text])[0]
+    
+    def analyze_sentiment_batch(self, texts: List[str]) -> List[Dict]:
+        """Analyze sentiment for many texts, only running models on cache misses"""
+        hashes = [content_hash(text) for text in texts]
+        cached = self.lookup_cached_sentiment(hashes)
+        
+        # Score each uncached text once, even if it repeats within the batch
+        misses = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in cached:
+                misses.setdefault(text_hash, text)
+        
+        if misses:
+            scored = dict(zip(misses, self.score_sentiment_parallel(list(misses.values()))))
+            self.store_cached_sentiment(scored)
+            cached.update(scored)
+        
+        return [dict(cached[text_hash]) for text_hash in hashes]
+    
+    def scorer_id(self) -> str:
+        """Identify the models producing scores, so cached results from other scorers are ignored"""
+        vader_mode = "fast-vader" if self.fast_vader else "full-vader"
+        return f"v{SENTIMENT_SCORER_VERSION}:{FINBERT_MODEL_NAME}:{self.finbert_backend}:{vader_mode}"
+    
+    def lookup_cached_sentiment(self, hashes: List[bytes]) -> Dict[bytes, Dict]:
+        """Fetch cached sentiment results for the given text hashes"""
+        cached = {}
+        unique_hashes = list(set(hashes))
+        scorer = self.scorer_id()
+        
+        for chunk in chunked(unique_hashes, CACHE_LOOKUP_CHUNK):
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.sent_cache.execute(
+                f"SELECT hash, vader, finbert, label FROM sentiment_cache "
+                f"WHERE scorer = ? AND hash IN ({placeholders})",
+                [scorer] + chunk
+            )
+            for text_hash, vader, finbert, label in rows:
+                cached[text_hash] = {'vader_score': vader, 'finbert_score': finbert, 'finbert_label': label}
+        
+        return cached
+    
+    def store_cached_sentiment(self, scored: Dict[bytes, Dict]):
+        """Persist fresh sentiment results, skipping ones FinBERT could not score"""
+        scorer = self.scorer_id()
+        rows = [
+            (text_hash, scorer, result['vader_score'], result['finbert_score'], result['finbert_label'])
+            for text_hash, result in scored.items()
+            if result.get('finbert_score') is not None
+        ]
+        
+        try:
+            with self.sent_cache:
+                self.sent_cache.executemany(
+                    "INSERT OR REPLACE INTO sentiment_cache (hash, scorer, vader, finbert, label) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+        except Exception as e:
+            print(f"Error storing sentiment cache: {e}")
+    
+    def vader_scores(self, texts: List[str]) -> List[float]:
+        """VADER compound scores, using the vectorized scorer for short plain texts"""
+        scores = self.fast_vader.score(texts) if self.fast_vader else [None] * len(texts)
+        
+        return [
+            self.vader.polarity_scores(cap_emoji(text))['compound'] if score is None else score
+            for text, score in zip(texts, scores)
+        ]
+    
+    def finbert_scores(self, texts: List[str]) -> List[tuple]:
+        """Compound score (positive - negative) and label for one FinBERT batch"""
+        # Truncate by tokens rather than characters to use the full 512-token window
+        encoded = self.finbert_tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=512,
+            return_tensors="pt"
+        )
+        if self.finbert_device >= 0:
+            encoded = encoded.to(self.finbert_device)
+        
+        with torch.inference_mode():
+            probs = self.finbert_model(**encoded).logits.float().softmax(-1)
         
+        compound = (probs[:, self.finbert_pos_idx] - probs[:, self.finbert_neg_idx]).tolist()
+        labels = [self.finbert_id2label[i] for i in torch.argmax(probs, dim=-1).tolist()]
+        
+        return list(zip(compound, labels))
+    
+    def score_sentiment_parallel(self, texts: List[str]) -> List[Dict]:
+        """Score texts across a process pool when FinBERT runs on CPU"""
+        workers = min(SENTIMENT_WORKERS, math.ceil(len(texts) / FINBERT_BATCH_SIZE))
+        
+        if (self.finbert_model is None or self.finbert_device >= 0 or workers <= 1
+                or len(texts) < SENTIMENT_PARALLEL_MIN_TEXTS):
+            return self.score_sentiment_batch(texts)
+        
+        shards = chunked(texts, math.ceil(len(texts) / workers))
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        
+        try:
+            # Spawn rather than fork: forking after torch has started its thread pools can deadlock
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=init_scoring_worker,
+                                     initargs=(torch_threads, self.finbert_backend)) as executor:
+                return [result for shard in executor.map(score_texts, shards) for result in shard]
+        except Exception as e:
+            print(f"Parallel sentiment scoring failed, scoring in-process: {e}")
+            return self.score_sentiment_batch(texts)
+    
+    def score_sentiment_batch(self, texts: List[str]) -> List[Dict]:
+        """Run VADER and batched FinBERT over texts without consulting the cache"""
         # VADER analysis
-        vader_scores = self.vader.polarity_scores(text)
-        results['vader_score'] = vader_scores['compound']
+        results = [{'vader_score': score} for score in self.vader_scores(texts)]
         
         # FinBERT analysis
-        if self.finbert_pipeline:
+        if self.finbert_model is not None and texts:
             try:
-                # Truncate text to avoid token limits
-                text_truncated = text[:512]
-                finbert_result = self.finbert_pipeline(text_truncated)
-                
-                # Convert to compound score (-1 to 1)
-                for score_dict in finbert_result[0]:
-                    if score_dict['label'] == 'positive':
-                        pos_score = score_dict['score']
-                    elif score_dict['label'] == 'negative':
-                        neg_score = score_dict['score']
-                    elif score_dict['label'] == 'neutral':
-                        neu_score = score_dict['score']
-                
-                # Create compound score
-                results['finbert_score'] = pos_score - neg_score
-                results['finbert_label'] = max(finbert_result[0], key=lambda x: x['score'])['label']
+                for batch_results, batch_texts in zip(chunked(results, FINBERT_BATCH_SIZE),
+                                                      chunked(texts, FINBERT_BATCH_SIZE)):
+                    for result, (score, label) in zip(batch_results, self.finbert_scores(batch_texts)):
+                        result['finbert_score'] = score
+                        result['finbert_label'] = label
                 
             except Exception as e:
                 print(f"FinBERT analysis failed: {e}")
-                results['finbert_score'] = None
-                results['finbert_label'] = None
+                for result in results:
+                    result['finbert_score'] = None
+                    result['finbert_label'] = None
         else:
-            results['finbert_score'] = None
-            results['finbert_label'] = None
+            for result in results:
+                result['finbert_score'] = None
+                result['finbert_label'] = None
         
         return results
     
+    def create_reddit(self) -> praw.Reddit:
+        """Build a Reddit API client"""
+        return praw.Reddit(
+            client_id=REDDIT_CLIENT_ID,
+            client_secret=REDDIT_CLIENT_SECRET,
+            user_agent=REDDIT_USER_AGENT
+        )
+    
+    def thread_reddit(self) -> praw.Reddit:
+        """Reddit client owned by the calling thread"""
+        if not hasattr(self.reddit_local, 'reddit'):
+            self.reddit_local.reddit = self.create_reddit()
+        return self.reddit_local.reddit
+    
     def collect_reddit_data(self, ticker: str, days_back: int = 7) -> List[Dict]:
         """Collect Reddit posts about a ticker"""
         if not self.reddit:
             return []
         
-        posts = []
-        subreddits = ['stocks', 'investing', 'SecurityAnalysis', 'ValueInvesting', 'wallstreetbets']
-        
+        # One bulk ID search plus batched info() calls instead of a search per subreddit
         try:
-            for subreddit_name in subreddits:
-                subreddit = self.reddit.subreddit(subreddit_name)
-                
-                # Search for ticker mentions
-                for submission in subreddit.search(f"${ticker}", time_filter="week", limit=20):
-                    # Check if post is within date range
-                    post_date = datetime.fromtimestamp(submission.created_utc).date()
-                    if (date.today() - post_date).days <= days_back:
-                        
-                        # Combine title and selftext
-                        text_content = f"{submission.title} {submission.selftext}"
-                        
-                        if len(text_content.strip()) > 10:  # Filter out very short posts
-                            posts.append({
-                                'timestamp': post_date.isoformat() + "T00:00:00Z",
-                                'source': f'reddit_{subreddit_name}',
-                                'text_content': text_content[:1000],  # Limit length
-                                'ticker': ticker.upper()
-                            })
-                
-                time.sleep(1)  # Rate limiting
-                
+            submission_ids = self.fetch_pullpush_ids(ticker, days_back)
+            if submission_ids:
+                return self.fetch_reddit_submissions(submission_ids, ticker, days_back)
         except Exception as e:
-            print(f"Reddit collection failed for {ticker}: {e}")
+            print(f"Bulk Reddit search failed for {ticker}, falling back to subreddit search: {e}")
+        
+        posts = []
+        
+        # Search all subreddits concurrently; the token bucket does the rate limiting
+        futures = {
+            subreddit_name: self.reddit_executor.submit(self.search_subreddit, subreddit_name, ticker, days_back)
+            for subreddit_name in REDDIT_SUBREDDITS
+        }
+        
+        for subreddit_name, future in futures.items():
+            try:
+                posts.extend(future.result())
+            except Exception as e:
+                print(f"Reddit collection failed for {ticker} in r/{subreddit_name}: {e}")
         
         return posts
     
-    def collect_yahoo_headlines(self, ticker: str, days_back: int = 7) -> List[Dict]:
-        """Collect Yahoo Finance news headlines"""
-        headlines = []
+    def fetch_pullpush_ids(self, ticker: str, days_back: int = 7) -> List[str]:
+        """Find submission IDs mentioning a ticker across all subreddits in one request"""
+        params = {
+            "q": f"${ticker}",
+            "subreddit": ",".join(REDDIT_SUBREDDITS),
+            "after": int(time.time()) - days_back * 86400,
+            "size": PULLPUSH_PAGE_SIZE
+        }
         
-        try:
-            stock = yf.Ticker(ticker)
-            news = stock.news
-            
-            cutoff_date = date.today() - timedelta(days=days_back)
+        response = self.http.get(PULLPUSH_URL, params=params, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        
+        return [submission['id'] for submission in orjson.loads(response.content).get('data', [])]
+    
+    def fetch_reddit_submissions(self, submission_ids: List[str], ticker: str, days_back: int = 7) -> List[Dict]:
+        """Load full submissions through reddit.info() in batches of 100"""
+        posts = []
+        fullnames = [f"t3_{submission_id}" for submission_id in submission_ids]
+        
+        for chunk in chunked(fullnames, REDDIT_INFO_BATCH):
+            self.reddit_bucket.acquire()
+            for submission in self.thread_reddit().info(fullnames=chunk):
+                post = self.reddit_post(submission, submission.subreddit.display_name, ticker, days_back)
+                if post:
+                    posts.append(post)
+        
+        return posts
+    
+    def search_subreddit(self, subreddit_name: str, ticker: str, days_back: int = 7) -> List[Dict]:
+        """Search one subreddit for ticker mentions"""
+        subreddit = self.thread_reddit().subreddit(subreddit_name)
+        
+        # Search for ticker mentions (a single listing request)
+        self.reddit_bucket.acquire()
+        submissions = list(subreddit.search(f"${ticker}", time_filter="week", limit=20))
+        
+        posts = [self.reddit_post(submission, subreddit_name, ticker, days_back) for submission in submissions]
+        return [post for post in posts if post]
+    
+    def reddit_post(self, submission, subreddit_name: str, ticker: str, days_back: int = 7) -> Optional[Dict]:
+        """Convert a submission to a data point, or None if it is too old or too short"""
+        # Check if post is within date range
+        post_date = date.fromtimestamp(submission.created_utc)
+        if (date.today() - post_date).days > days_back:
+            return None
+        
+        # Combine title and selftext
+        text_content = f"{submission.title} {submission.selftext}"
+        
+        if len(text_content.strip()) <= 10:  # Filter out very short posts
+            return None
+        
+        return {
+            'timestamp': post_date.isoformat() + "T00:00:00Z",
+            'source': f'reddit_{subreddit_name}',
+            'text_content': text_content[:1000],  # Limit length
+            'ticker': ticker.upper()
+        }
+    
+    async def fetch_yahoo_news(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                               query: str, news_count: int) -> List[Dict]:
+        """Fetch raw news articles from Yahoo's search endpoint"""
+        # Same search endpoint yfinance's Ticker.news reads from
+        url = "https://query2.finance.yahoo.com/v1/finance/search"
+        params = {"q": query, "quotesCount": 0, "newsCount": news_count}
+        
+        async with semaphore:
+            async with session.get(url, params=params) as response:
+                response.raise_for_status()
+                data = orjson.loads(await response.read())
+        
+        return data.get('news', [])
+    
+    async def collect_yahoo_headlines(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                      tickers: List[str], days_back: int = 7) -> Dict[str, List[Dict]]:
+        """Collect Yahoo Finance news headlines for many tickers at once"""
+        symbols = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        
+        # The search endpoint takes a single query, so each ticker gets its own concurrent request
+        results = await asyncio.gather(
+            *[self.fetch_yahoo_news(session, semaphore, ticker, YAHOO_NEWS_COUNT) for ticker in symbols],
+            return_exceptions=True
+        )
+        
+        articles_by_ticker = {}
+        for ticker, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                print(f"Yahoo Finance collection failed for {ticker}: {result}")
+                result = []
+            articles_by_ticker[ticker] = result
+        
+        cutoff_date = date.today() - timedelta(days=days_back)
+        headlines = {}
+        
+        for ticker, articles in articles_by_ticker.items():
+            headlines[ticker] = []
             
-            for article in news:
-                # Convert timestamp to date
-                article_date = datetime.fromtimestamp(article['providerPublishTime']).date()
-                
-                if article_date >= cutoff_date:
-                    headlines.append({
-                        'timestamp': article_date.isoformat() + "T00:00:00Z",
-                        'source': 'yahoo_finance',
-                        'text_content': article['title'],
-                        'ticker': ticker.upper()
-                    })
+            for article in articles:
+                try:
+                    # Convert timestamp to date
+                    article_date = date.fromtimestamp(article['providerPublishTime'])
                     
-        except Exception as e:
-            print(f"Yahoo Finance collection failed for {ticker}: {e}")
+                    if article_date >= cutoff_date:
+                        headlines[ticker].append({
+                            'timestamp': article_date.isoformat() + "T00:00:00Z",
+                            'source': 'yahoo_finance',
+                            'text_content': article['title'],
+                            'ticker': ticker
+                        })
+                except Exception as e:
+                    print(f"Yahoo Finance article parsing failed for {ticker}: {e}")
         
         return headlines
     
-    def collect_stocktwits_data(self, ticker: str, days_back: int = 7) -> List[Dict]:
+    async def collect_stocktwits_data(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                      ticker: str, days_back: int = 7) -> List[Dict]:
         """Collect StockTwits messages (using public API)"""
         messages = []
         
         try:
             url = f"https://api.stocktwits.com/api/2/streams/symbol/{ticker}.json"
-            response = requests.get(url, timeout=30)
             
-            if response.status_code == 200:
-                data = response.json()
-                cutoff_date = date.today() - timedelta(days=days_back)
+            async with semaphore:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        return messages
+                    data = orjson.loads(await response.read())
+            
+            cutoff_date = date.today() - timedelta(days=days_back)
+            
+            for message in data.get('messages', []):
+                # Parse created_at timestamp
+                created_at = iso_date(message['created_at'])
                 
-                for message in data.get('messages', []):
-                    # Parse created_at timestamp
-                    created_at = datetime.strptime(message['created_at'], '%Y-%m-%dT%H:%M:%SZ').date()
-                    
-                    if created_at >= cutoff_date:
-                        messages.append({
-                            'timestamp': created_at.isoformat() + "T00:00:00Z",
-                            'source': 'stocktwits',
-                            'text_content': message['body'],
-                            'ticker': ticker.upper()
-                        })
+                if created_at >= cutoff_date:
+                    messages.append({
+                        'timestamp': created_at.isoformat() + "T00:00:00Z",
+                        'source': 'stocktwits',
+                        'text_content': message['body'],
+                        'ticker': ticker.upper()
+                    })
                         
         except Exception as e:
             print(f"StockTwits collection failed for {ticker}: {e}")
         
         return messages
     
+    async def collect_http_data(self, tickers: List[str], days_back: int = 7) -> List[List[Dict]]:
+        """Fetch Yahoo and StockTwits data for all tickers concurrently"""
+        semaphore = asyncio.Semaphore(HTTP_CONCURRENCY)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        headers = {"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip"}
+        connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, limit_per_host=HTTP_POOL_PER_HOST)
+        
+        # One keep-alive session for every ticker so TCP/TLS connections are reused
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            yahoo_data, stocktwits_data = await asyncio.gather(
+                self.collect_yahoo_headlines(session, semaphore, tickers, days_back),
+                asyncio.gather(*[
+                    self.collect_stocktwits_data(session, semaphore, ticker, days_back)
+                    for ticker in tickers
+                ])
+            )
+        
+        return [
+            yahoo_data[ticker.upper()] + ticker_stocktwits
+            for ticker, ticker_stocktwits in zip(tickers, stocktwits_data)
+        ]
+    
+    async def collect_all_data(self, tickers: List[str], days_back: int = 7) -> Dict[str, List[Dict]]:
+        """Collect text samples from every source, overlapping network waits"""
+        def collect_reddit():
+            # PRAW is synchronous, so Reddit runs serially in a worker thread
+            return [self.collect_reddit_data(ticker, days_back) for ticker in tickers]
+        
+        reddit_results, http_results = await asyncio.gather(
+            asyncio.to_thread(collect_reddit),
+            self.collect_http_data(tickers, days_back)
+        )
+        
+        return {
+            ticker: reddit_data + http_data
+            for ticker, reddit_data, http_data in zip(tickers, reddit_results, http_results)
+        }
+    
     def store_sentiment_data(self, data_points: List[Dict]):
         """Store sentiment analysis results in database"""
-        conn = sqlite3.connect(self.db_path)
+        rows = [
+            (
+                point['timestamp'],
+                point['ticker'],
+                point['source'],
+                point['text_content'],
+                content_hash(point['text_content']),
+                point.get('vader_score'),
+                point.get('finbert_score'),
+                point.get('finbert_label')
+            )
+            for point in data_points
+        ]
         
-        for point in data_points:
-            try:
-                conn.execute('''
+        try:
+            # Single transaction for the whole batch
+            with self.conn:
+                self.conn.executemany('''
                     INSERT OR IGNORE INTO sentiment_data 
-                    (timestamp, ticker, source, text_content, vader_score, finbert_score, finbert_label)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    point['timestamp'],
-                    point['ticker'],
-                    point['source'],
-                    point['text_content'],
-                    point.get('vader_score'),
-                    point.get('finbert_score'),
-                    point.get('finbert_label')
-                ))
-            except Exception as e:
-                print(f"Error storing sentiment data: {e}")
-        
-        conn.commit()
-        conn.close()
+                    (timestamp, ticker, source, text_content, content_hash, vader_score, finbert_score, finbert_label)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+        except Exception as e:
+            print(f"Error storing sentiment data: {e}")
     
     def aggregate_daily_sentiment(self, ticker: str, days_back: int = 30):
         """Aggregate sentiment scores by day"""
-        conn = sqlite3.connect(self.db_path)
-        
-        # Get daily aggregates
-        cursor = conn.execute('''
-            SELECT 
-                DATE(timestamp) as date,
-                AVG(vader_score) as avg_vader,
-                AVG(finbert_score) as avg_finbert,
-                COUNT(*) as post_count
-            FROM sentiment_data 
-            WHERE ticker = ? AND timestamp >= ?
-            GROUP BY DATE(timestamp)
-            ORDER BY date
-        ''', (ticker.upper(), (date.today() - timedelta(days=days_back)).isoformat()))
-        
-        for row in cursor.fetchall():
-            try:
-                conn.execute('''
+        try:
+            # Aggregate and upsert in one statement, no round-trip through Python
+            with self.conn:
+                self.conn.execute('''
                     INSERT OR REPLACE INTO daily_sentiment 
                     (date, ticker, avg_vader_score, avg_finbert_score, post_count)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', row)
-            except Exception as e:
-                print(f"Error storing daily sentiment: {e}")
-        
-        conn.commit()
-        conn.close()
+                    SELECT 
+                        DATE(timestamp),
+                        ticker,
+                        AVG(vader_score),
+                        AVG(finbert_score),
+                        COUNT(*)
+                    FROM sentiment_data 
+                    WHERE ticker = ? AND timestamp >= ?
+                    GROUP BY DATE(timestamp)
+                ''', (ticker.upper(), (date.today() - timedelta(days=days_back)).isoformat()))
+        except Exception as e:
+            print(f"Error storing daily sentiment: {e}")
     
     def run_sentiment_collection(self, tickers: List[str], days_back: int = 7):
         """Run complete sentiment collection pipeline"""
+        print(f"Collecting sentiment data for {', '.join(tickers)}...")
+        collected = asyncio.run(self.collect_all_data(tickers, days_back))
+        
+        all_data = []
+        for ticker, ticker_data in collected.items():
+            print(f"Collected {len(ticker_data)} text samples for {ticker}")
+            all_data.extend(ticker_data)
+        
+        # Analyze each distinct text once in a batched pass, then fan scores back out
+        unique_texts = list(dict.fromkeys(d['text_content'] for d in all_data))
+        print(f"Analyzing sentiment for {len(unique_texts)} unique of {len(all_data)} text samples...")
+        scores_by_text = dict(zip(unique_texts, self.analyze_sentiment_batch(unique_texts)))
+        for data_point in all_data:
+            data_point.update(scores_by_text[data_point['text_content']])
+        
+        # Store in database
+        self.store_sentiment_data(all_data)
+        
+        # Aggregate daily scores
         for ticker in tickers:
-            print(f"Collecting sentiment data for {ticker}...")
-            
-            all_data = []
-            
-            # Collect from all sources
-            reddit_data = self.collect_reddit_data(ticker, days_back)
-            yahoo_data = self.collect_yahoo_headlines(ticker, days_back)
-            stocktwits_data = self.collect_stocktwits_data(ticker, days_back)
-            
-            all_data.extend(reddit_data)
-            all_data.extend(yahoo_data)
-            all_data.extend(stocktwits_data)
-            
-            print(f"Collected {len(all_data)} text samples for {ticker}")
-            
-            # Analyze sentiment for each text sample
-            for data_point in all_data:
-                sentiment_results = self.analyze_sentiment(data_point['text_content'])
-                data_point.update(sentiment_results)
-            
-            # Store in database
-            self.store_sentiment_data(all_data)
-            
-            # Aggregate daily scores
             self.aggregate_daily_sentiment(ticker, days_back)
-            
             print(f"Completed sentiment analysis for {ticker}")
-            time.sleep(2)  # Rate limiting between tickers
+
+# Per-process analyzer for the scoring pool, loaded once by init_scoring_worker
+worker_analyzer = None
+
+def init_scoring_worker(torch_threads: int, finbert_backend: str):
+    """Process pool initializer: load the parent's FinBERT backend once per worker"""
+    global worker_analyzer
+    # set_num_threads covers the torch fallback; the ONNX session gets finbert_threads
+    torch.set_num_threads(torch_threads)
+    worker_analyzer = SentimentAnalyzer(models_only=True, finbert_threads=torch_threads,
+                                        finbert_backend=finbert_backend)
+
+def score_texts(texts: List[str]) -> List[Dict]:
+    """Score one shard of texts inside a pool worker"""
+    # Fail the shard rather than return unscored results, so the parent scores in-process
+    if worker_analyzer.finbert_model is None:
+        raise RuntimeError("FinBERT failed to load in scoring worker")
+    return worker_analyzer.score_sentiment_batch(texts)
 
 def main():
     import sys
@@ -338,6 +954,8 @@ def main():
     else:
         # Default: collect last 7 days
         analyzer.run_sentiment_collection(tickers, 7)
+    
+    analyzer.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file